@@ -0,0 +1,14 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def make_record():
+    """Factory for a fixed test patient's MedicalRecord; keyword arguments set the timestamps"""
+    def make(**timestamps):
+        return app.MedicalRecord(
+            patient_id="P900", patient_name="Test", age=40, gender="Other", diagnosis="Checkup",
+            treatment="None", doctor="Dr. Test", hospital="Test Clinic", severity="Low", **timestamps
+        )
+    return make
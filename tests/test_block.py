@@ -0,0 +1,36 @@
+import app
+
+
+def test_pre_1970_record_is_added_and_validates(make_record):
+    blockchain = app.EnhancedEHRBlockchain()
+    record = make_record(timestamp="1960-01-01 00:00:00")
+    assert record.timestamp_ns < 0
+    assert blockchain.add_medical_record(record, show_mining=False)
+    assert blockchain.get_latest_block().timestamp_ns == record.timestamp_ns
+    assert blockchain.validate_chain()
+
+
+def _seeded_chain():
+    blockchain = app.EnhancedEHRBlockchain()
+    blockchain.add_medical_records_bulk([app.MedicalRecord(**data) for data in app.get_sample_medical_data()],
+                                        skip_mining=True)
+    return blockchain
+
+
+def test_validate_chain_detects_edited_middle_block():
+    blockchain = _seeded_chain()
+    assert blockchain.validate_chain()
+    middle = blockchain.chain[len(blockchain.chain) // 2]
+    middle.data["diagnosis"] = "Edited"
+    assert not blockchain.validate_chain()
+    # Repeated validation must re-check the edited block rather than trusting an earlier pass
+    assert not blockchain.validate_chain()
+
+
+def test_mined_block_hash_meets_difficulty(make_record):
+    # Fixed inputs, so the nonce search is deterministic and finishes within max_nonce
+    record = make_record(timestamp_ns=1_700_000_000_000_000_000)
+    block = app.Block(index=1, timestamp_ns=record.timestamp_ns, data=record.to_dict(), previous_hash=bytes(32))
+    assert block.hash.startswith("00")
+    assert block.hash == block.calculate_hash()
+    assert block.verify_hash()
@@ -0,0 +1,27 @@
+import datetime
+
+
+def test_timestamp_ns_is_derived_from_given_timestamp(make_record):
+    record = make_record(timestamp="2020-01-01 00:00:00")
+    expected = datetime.datetime(2020, 1, 1).timestamp()
+    assert record.timestamp_ns == round(expected * 1e6) * 1000
+    assert record.timestamp == "2020-01-01 00:00:00"
+
+
+def test_timestamp_is_derived_from_given_timestamp_ns(make_record):
+    ns = round(datetime.datetime(2021, 6, 15, 8, 30, 0, 123456).timestamp() * 1e6) * 1000
+    record = make_record(timestamp_ns=ns)
+    assert record.timestamp == "2021-06-15 08:30:00.123456"
+
+
+def test_round_trip_keeps_both_forms_consistent(make_record):
+    original = make_record(timestamp="2022-03-04 05:06:07.891011")
+    assert make_record(timestamp_ns=original.timestamp_ns).timestamp == original.timestamp
+
+
+def test_defaults_to_now_when_neither_is_given(make_record):
+    before = datetime.datetime.now().timestamp()
+    record = make_record()
+    after = datetime.datetime.now().timestamp()
+    assert before - 1 <= record.timestamp_ns / 1e9 <= after + 1
+    assert record.timestamp == str(datetime.datetime.fromtimestamp(record.timestamp_ns / 1e9))
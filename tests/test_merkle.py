@@ -0,0 +1,95 @@
+import hashlib
+
+import pytest
+
+import app
+
+
+def _leaves(n):
+    return [hashlib.sha256(bytes([i])).digest() for i in range(n)]
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 5, 7, 10, 11])
+def test_every_leaf_proves_against_root(n):
+    leaves = _leaves(n)
+    root, proofs = app._merkle_tree(leaves)
+    assert len(proofs) == n
+    for leaf, proof in zip(leaves, proofs):
+        assert app._merkle_verify(leaf, proof, root)
+
+
+def test_empty_tree_has_fixed_root():
+    assert app._merkle_tree([]) == (app.EMPTY_MERKLE_ROOT, [])
+
+
+def test_block_with_empty_data_is_valid():
+    block = app.Block(index=1, timestamp_ns=1, data={}, previous_hash=bytes(32))
+    assert block.merkle_root_bytes == app.EMPTY_MERKLE_ROOT
+    assert block.verify_hash()
+    assert not block.verify_field("message")
+
+
+@pytest.mark.parametrize("n", [3, 5, 7])
+def test_odd_level_duplicates_last_node(n):
+    leaves = _leaves(n)
+    root, _ = app._merkle_tree(leaves)
+    # Same tree as explicitly padding the leaf level with a copy of the last leaf
+    padded_root, _ = app._merkle_tree(leaves + leaves[-1:])
+    assert root == padded_root
+
+
+@pytest.mark.parametrize("n", [3, 5, 7])
+def test_proof_rejects_wrong_leaf_or_position(n):
+    leaves = _leaves(n)
+    root, proofs = app._merkle_tree(leaves)
+    assert not app._merkle_verify(b"\x00" * 32, proofs[0], root)
+    # A valid leaf checked with another leaf's proof must fail
+    assert not app._merkle_verify(leaves[0], proofs[1], root)
+
+
+@pytest.fixture
+def block(make_record):
+    record = make_record(timestamp_ns=1_700_000_000_000_000_000)
+    return app.Block(index=1, timestamp_ns=1, data=record.to_dict(), previous_hash=bytes(32), skip_mining=True)
+
+
+def test_verify_field_accepts_untouched_fields(block):
+    # 11 fields, so the tree has odd-sized levels
+    assert len(block.data) % 2 == 1
+    assert all(block.verify_field(key) for key in block.data)
+
+
+def test_verify_field_rejects_tampered_field(block):
+    block.data["age"] = 99
+    assert not block.verify_field("age")
+    assert block.verify_field("doctor")
+
+
+def test_verify_field_rejects_added_or_unknown_field(block):
+    assert not block.verify_field("blood_type")
+    block.data["blood_type"] = "O+"
+    assert not block.verify_field("doctor")
+
+
+def test_block_hash_commits_to_merkle_root(block):
+    assert block.verify_hash()
+    block.merkle_root_bytes = bytes(32)
+    assert not block.verify_hash()
+
+
+def test_spot_check_field_passes_on_untampered_chain():
+    blockchain = app.EnhancedEHRBlockchain()
+    blockchain.add_medical_records_bulk([app.MedicalRecord(**data) for data in app.get_sample_medical_data()],
+                                        skip_mining=True)
+    for _ in range(50):
+        index, key, field_ok = blockchain.spot_check_field()
+        assert key in blockchain.chain[index].data
+        assert field_ok
+
+
+def test_spot_check_field_reports_tampered_field():
+    blockchain = app.EnhancedEHRBlockchain()
+    # Only the genesis block exists, with a single field after the edit below
+    blockchain.chain[0].data.clear()
+    blockchain.chain[0].data["message"] = "edited"
+    assert blockchain.spot_check_field() == (0, "message", False)